@@ -3,6 +3,99 @@ const path = require('path');
 const fs = require('fs');
 const csv = require('csv-parser'); // Move this to the top
 
+const pythonDir = path.join(__dirname, '../python');
+
+// Forecasts younger than this are served without re-running the Python script.
+// Read lazily because this module is loaded before dotenv.config() runs.
+const getForecastTtlHours = () => parseFloat(process.env.FORECAST_TTL_HOURS) || 24;
+
+// Demand log read by forecastScheduler.py and the metrics file it writes back
+const forecastRequestLog = path.join(pythonDir, 'forecast_requests.log');
+const schedulerMetricsFile = path.join(pythonDir, 'forecast_scheduler_metrics.json');
+
+// Age in hours of the stored future forecast for a city (Infinity if missing)
+const getForecastAgeHours = (city) => {
+  try {
+    const { mtimeMs } = fs.statSync(path.join(pythonDir, `${city}_future_weather.csv`));
+    return (Date.now() - mtimeMs) / (1000 * 60 * 60);
+  } catch (err) {
+    return Infinity;
+  }
+};
+
+// Marker held while weatherForecast.py runs for a city, shared with forecastScheduler.py
+const FORECAST_LOCK_STALE_MS = 5 * 60 * 1000;
+const forecastLockPath = (city) => path.join(pythonDir, `${city}_forecast.lock`);
+
+// Claim the city's forecast run; false if another request or the scheduler holds it
+const acquireForecastLock = (city) => {
+  const lockPath = forecastLockPath(city);
+  for (let attempt = 0; attempt < 2; attempt++) {
+    try {
+      fs.closeSync(fs.openSync(lockPath, 'wx'));
+      return true;
+    } catch (err) {
+      if (err.code !== 'EEXIST') {
+        console.error('Failed to create forecast lock:', err.message);
+        return false;
+      }
+      try {
+        // A lock older than any forecast run was left behind by a crashed process
+        if (Date.now() - fs.statSync(lockPath).mtimeMs < FORECAST_LOCK_STALE_MS) {
+          return false;
+        }
+        fs.unlinkSync(lockPath);
+      } catch (statErr) {
+        // Lock disappeared in the meantime, try again
+      }
+    }
+  }
+  return false;
+};
+
+// True while the city's lock exists and is recent enough to belong to a live run
+const isForecastLockHeld = (city) => {
+  try {
+    return Date.now() - fs.statSync(forecastLockPath(city)).mtimeMs < FORECAST_LOCK_STALE_MS;
+  } catch (err) {
+    return false;
+  }
+};
+
+const releaseForecastLock = (city) => {
+  fs.unlink(forecastLockPath(city), () => {});
+};
+
+// Wait for a forecast run started elsewhere and return its data if it is fresh
+const awaitInProgressForecast = async (city, timeoutMs = 180000) => {
+  const deadline = Date.now() + timeoutMs;
+  // Stop waiting as soon as the lock is released or turns out to be orphaned
+  while (isForecastLockHeld(city) && Date.now() < deadline) {
+    await new Promise(resolve => setTimeout(resolve, 1000));
+  }
+
+  if (getForecastAgeHours(city) >= getForecastTtlHours()) {
+    return null;
+  }
+  const data = await parseWeatherData(city);
+  return data && data.future && data.future.length > 0 ? data : null;
+};
+
+// Append a request to the demand log so the scheduler can pre-forecast popular cities
+const recordForecastRequest = (city, hit) => {
+  // Nothing consumes the log without the scheduler, so don't let it grow
+  if (process.env.ENABLE_FORECAST_SCHEDULER !== 'true') {
+    return;
+  }
+
+  const entry = JSON.stringify({ ts: Date.now() / 1000, city, hit }) + '\n';
+  fs.appendFile(forecastRequestLog, entry, (err) => {
+    if (err) {
+      console.error('Failed to record forecast request:', err.message);
+    }
+  });
+};
+
 // Weather prediction controller
 const getWeatherPrediction = async (req, res) => {
   try {
@@ -15,6 +108,22 @@ const getWeatherPrediction = async (req, res) => {
       });
     }
 
+    // Serve the stored forecast if the scheduler (or an earlier request) kept it fresh
+    const forecastAge = getForecastAgeHours(city);
+    if (forecastAge < getForecastTtlHours()) {
+      const cachedData = await parseWeatherData(city);
+      if (cachedData && cachedData.future && cachedData.future.length > 0) {
+        console.log(`Using existing data for ${city} (${forecastAge.toFixed(1)} hours old)`);
+        recordForecastRequest(city, true);
+        return res.json({
+          success: true,
+          message: 'Weather prediction completed successfully',
+          data: cachedData
+        });
+      }
+    }
+    recordForecastRequest(city, false);
+
     console.log(`Starting weather prediction for city: ${city}`);
 
     // Path to the Python script
@@ -28,6 +137,26 @@ const getWeatherPrediction = async (req, res) => {
       });
     }
 
+    // Another request or the scheduler is already forecasting this city
+    if (!acquireForecastLock(city)) {
+      console.log(`Forecast for ${city} already in progress, waiting for it...`);
+      const inProgressData = await awaitInProgressForecast(city);
+      if (inProgressData) {
+        return res.json({
+          success: true,
+          message: 'Weather prediction completed successfully',
+          data: inProgressData
+        });
+      }
+      // The other run failed or its lock was orphaned; take over if nobody else has
+      if (!acquireForecastLock(city)) {
+        return res.status(503).json({
+          success: false,
+          message: 'Weather prediction for this city is already in progress - please try again'
+        });
+      }
+    }
+
     // Create a promise to handle the Python process
     const weatherPrediction = new Promise((resolve, reject) => {
       // Spawn Python process with the city name as argument
@@ -104,7 +233,12 @@ const getWeatherPrediction = async (req, res) => {
     });
 
     // Wait for the prediction to complete
-    const weatherData = await weatherPrediction;
+    let weatherData;
+    try {
+      weatherData = await weatherPrediction;
+    } finally {
+      releaseForecastLock(city);
+    }
 
     res.json({
       success: true,
@@ -124,7 +258,6 @@ const getWeatherPrediction = async (req, res) => {
 
 // Function to parse CSV weather data
 const parseWeatherData = async (city) => {
-  const pythonDir = path.join(__dirname, '../python');
   const historicalFile = path.join(pythonDir, `${city}_historical_weather.csv`);
   const futureFile = path.join(pythonDir, `${city}_future_weather.csv`);
 
@@ -132,7 +265,9 @@ const parseWeatherData = async (city) => {
     city: city,
     historical: [],
     future: [],
-    lastUpdated: new Date().toISOString()
+    lastUpdated: fs.existsSync(futureFile)
+      ? fs.statSync(futureFile).mtime.toISOString()
+      : new Date().toISOString()
   };
 
   try {
@@ -358,8 +493,9 @@ const getWeatherForItinerary = async (req, res) => {
           const now = new Date();
           const hoursDiff = (now - lastUpdate) / (1000 * 60 * 60);
           
-          if (hoursDiff < 24) {
+          if (hoursDiff < getForecastTtlHours()) {
             console.log(`Using existing data for ${city} (${hoursDiff.toFixed(1)} hours old)`);
+            recordForecastRequest(city.trim(), true);
             return {
               city: city.trim(),
               success: true,
@@ -370,10 +506,28 @@ const getWeatherForItinerary = async (req, res) => {
         
         // Generate new prediction if no recent data exists
         console.log(`Generating new prediction for ${city}`);
+        recordForecastRequest(city.trim(), false);
+
+        // Reuse a run already in progress for this city instead of starting another
+        if (!acquireForecastLock(city.trim())) {
+          const inProgressData = await awaitInProgressForecast(city.trim(), 120000);
+          if (inProgressData) {
+            return {
+              city: city.trim(),
+              success: true,
+              data: inProgressData
+            };
+          }
+          if (!acquireForecastLock(city.trim())) {
+            throw new Error(`Prediction for ${city} is already in progress`);
+          }
+        }
         
         const weatherData = await new Promise((resolve, reject) => {
           const pythonScriptPath = path.join(__dirname, '../python/weatherForecast.py');
-          const pythonProcess = spawn('python', [pythonScriptPath, city.trim()]);
+          const pythonProcess = spawn('python', [pythonScriptPath, city.trim()], {
+            cwd: pythonDir
+          });
           
           let outputData = '';
           
@@ -403,7 +557,7 @@ const getWeatherForItinerary = async (req, res) => {
             pythonProcess.kill('SIGTERM');
             reject(new Error(`Timeout generating prediction for ${city}`));
           }, 120000);
-        });
+        }).finally(() => releaseForecastLock(city.trim()));
 
         return {
           city: city.trim(),
@@ -439,7 +593,98 @@ const getWeatherForItinerary = async (req, res) => {
   }
 };
 
+// Expose queue depth, refresh lag and hit ratio reported by the forecast scheduler
+const getForecastSchedulerMetrics = async (req, res) => {
+  try {
+    if (!fs.existsSync(schedulerMetricsFile)) {
+      return res.status(404).json({
+        success: false,
+        message: 'Forecast scheduler is not running'
+      });
+    }
+
+    const metrics = JSON.parse(await fs.promises.readFile(schedulerMetricsFile, 'utf-8'));
+
+    // The scheduler rewrites the file every pass; an old snapshot means it has stopped
+    const intervalSeconds = metrics.interval_seconds || 15;
+    const ageSeconds = Date.now() / 1000 - (metrics.timestamp || 0);
+    if (ageSeconds > Math.max(3 * intervalSeconds, 60)) {
+      return res.status(503).json({
+        success: false,
+        message: 'Forecast scheduler is not running',
+        stale: true,
+        data: metrics
+      });
+    }
+
+    res.json({
+      success: true,
+      data: metrics
+    });
+  } catch (error) {
+    console.error('Forecast scheduler metrics error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to read forecast scheduler metrics'
+    });
+  }
+};
+
+// Start the background pre-forecasting scheduler alongside the server
+const startForecastScheduler = () => {
+  const schedulerScriptPath = path.join(pythonDir, 'forecastScheduler.py');
+  const args = [schedulerScriptPath, '--ttl-hours', String(getForecastTtlHours()), '--exit-with-parent'];
+
+  // Defaults to 0.75 x TTL in the scheduler; must stay below FORECAST_TTL_HOURS
+  if (process.env.FORECAST_REFRESH_AFTER_HOURS) {
+    args.push('--refresh-after-hours', process.env.FORECAST_REFRESH_AFTER_HOURS);
+  }
+
+  if (process.env.FORECAST_SCHEDULER_CONCURRENCY) {
+    args.push('--concurrency', process.env.FORECAST_SCHEDULER_CONCURRENCY);
+  }
+  if (process.env.FORECAST_SCHEDULER_CPU_BUDGET) {
+    args.push('--cpu-budget', process.env.FORECAST_SCHEDULER_CPU_BUDGET);
+  }
+
+  const schedulerProcess = spawn('python', args, {
+    cwd: pythonDir,
+    stdio: ['ignore', 'ignore', 'pipe']
+  });
+
+  schedulerProcess.stderr.on('data', (data) => {
+    console.log('Forecast scheduler:', data.toString().trim());
+  });
+
+  schedulerProcess.on('error', (error) => {
+    console.error('Failed to start forecast scheduler:', error.message);
+  });
+
+  schedulerProcess.on('close', (code) => {
+    console.log(`Forecast scheduler exited with code: ${code}`);
+  });
+
+  // Stop the scheduler with the server so restarts don't leave duplicates behind
+  const stopScheduler = () => {
+    if (schedulerProcess.exitCode === null && schedulerProcess.signalCode === null) {
+      schedulerProcess.kill('SIGTERM');
+    }
+  };
+  process.on('exit', stopScheduler);
+  ['SIGTERM', 'SIGINT'].forEach((signal) => {
+    process.once(signal, () => {
+      stopScheduler();
+      // Re-raise now that this listener is gone so the default handling still applies
+      process.kill(process.pid, signal);
+    });
+  });
+
+  return schedulerProcess;
+};
+
 module.exports = {
   getWeatherPrediction,
-  getWeatherForItinerary
+  getWeatherForItinerary,
+  getForecastSchedulerMetrics,
+  startForecastScheduler
 };
\ No newline at end of file
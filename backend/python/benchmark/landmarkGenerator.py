@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Synthetic landmark generators for clustering.py benchmarks
+Produces deterministic payloads at several sizes and geographic densities
+"""
+
+import json
+import math
+import random
+import sys
+
+# Spread in degrees of landmark hotspots around the city centre
+DENSITIES = {
+    'dense': 0.02,     # Old-town core, everything within a few km
+    'city': 0.1,       # Typical city itinerary
+    'regional': 1.0    # Day trips across a region
+}
+
+SIZES = [10, 50, 200, 1000]
+
+CITY_CENTRES = [
+    ('Delhi', 28.6139, 77.2090),
+    ('Mumbai', 19.0760, 72.8777),
+    ('Bengaluru', 12.9716, 77.5946),
+    ('Jaipur', 26.9124, 75.7873),
+    ('Kolkata', 22.5726, 88.3639)
+]
+
+
+def generate_landmarks(size, density='city', seed=42):
+    """Landmarks grouped around a handful of hotspots, like real tourist areas"""
+    spread = DENSITIES[density]
+    rng = random.Random(f"{size}-{density}-{seed}")
+    city, centre_lat, centre_lon = CITY_CENTRES[seed % len(CITY_CENTRES)]
+
+    hotspot_count = max(1, int(math.sqrt(size) / 2))
+    hotspots = [
+        (centre_lat + rng.gauss(0, spread), centre_lon + rng.gauss(0, spread))
+        for _ in range(hotspot_count)
+    ]
+
+    landmarks = []
+    for i in range(size):
+        lat, lon = rng.choice(hotspots)
+        landmarks.append({
+            'name': f"{city} Landmark {i + 1}",
+            'latitude': round(lat + rng.gauss(0, spread / 4), 6),
+            'longitude': round(lon + rng.gauss(0, spread / 4), 6),
+            'popularity': round(min(100, max(0, rng.gauss(60, 20))), 1),
+            'score': round(rng.uniform(30, 100), 1)
+        })
+    return landmarks
+
+
+def generate_payload(size, density='city', days=3, seed=42):
+    """stdin payload in the format itineraryController sends to clustering.py"""
+    return {
+        'landmarks': generate_landmarks(size, density, seed),
+        'k': days
+    }
+
+
+def scenarios(sizes=None, densities=None, days=3):
+    """All (name, payload) combinations of the requested sizes and densities"""
+    for size in sizes or SIZES:
+        for density in densities or DENSITIES:
+            yield f"landmarks-{size}-{density}", generate_payload(size, density, days)
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    density = sys.argv[2] if len(sys.argv) > 2 else 'city'
+    print(json.dumps(generate_payload(size, density)))
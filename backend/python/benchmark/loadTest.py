@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Load test and benchmark harness for the Python compute entry points
+Drives clustering.py (stdin JSON) and weatherForecast.py <city> the same way the
+Node controllers do, fully offline, and records a JSON baseline for comparison
+
+Usage:
+    python benchmark/loadTest.py --suite clustering --concurrency 1,4
+    python benchmark/loadTest.py                                   # writes benchmark/baseline.json
+    python benchmark/loadTest.py --compare benchmark/baseline.json # writes benchmark/results-<timestamp>.json
+    python benchmark/loadTest.py --compare benchmark/baseline.json --update-baseline
+
+The Node backend spawns a fresh interpreter for every request, so no run here
+reuses a process. What is measured:
+  <script>/startup  interpreter start plus the script's library imports, which
+                    every request pays. "cold" is the first such process this
+                    harness starts (installed bytecode, OS page cache not yet
+                    warmed by us), approximating the first request after a
+                    server or container start; "warm" is the steady state.
+  <script>/<case>   full runs after one unmeasured warm-up run, at each
+                    concurrency level.
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from landmarkGenerator import DENSITIES, SIZES, scenarios as landmark_scenarios
+from mockWeatherApi import MockWeatherApi
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PYTHON_DIR = os.path.dirname(BENCHMARK_DIR)
+CLUSTERING_SCRIPT = os.path.join(PYTHON_DIR, 'clustering.py')
+WEATHER_SCRIPT = os.path.join(PYTHON_DIR, 'weatherForecast.py')
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+
+# Top-level library imports of each script, timed by the startup scenarios
+CLUSTERING_IMPORTS = 'json, numpy, sklearn.cluster, sklearn.preprocessing, sklearn.metrics'
+WEATHER_IMPORTS = 'requests, pandas, prophet'
+
+WEATHER_CITIES = ['Delhi', 'Mumbai', 'Bengaluru', 'Jaipur', 'Kolkata', 'Pune', 'Patna', 'Goa']
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_process(command, stdin_data=None, env=None, cwd=None, timeout=300):
+    """Run one process to completion and measure latency and peak RSS"""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        cwd=cwd
+    )
+
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        if stdin_data is not None:
+            try:
+                process.stdin.write(stdin_data.encode('utf-8'))
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+        output = process.stdout.read().decode('utf-8', errors='replace')
+        process.stdout.close()
+
+        rss_mb = None
+        if hasattr(os, 'wait4'):
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            # ru_maxrss is kilobytes on Linux and bytes on macOS; it never drops below
+            # the harness's own size because the child starts as a fork of it
+            rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+    finally:
+        timer.cancel()
+
+    return {
+        'latency': time.perf_counter() - started,
+        'rss_mb': rss_mb,
+        'returncode': process.returncode,
+        'output': output
+    }
+
+
+def startup_runner(imports, python, timeout):
+    """Return a callable that starts an interpreter which only imports the given modules"""
+    def run(env):
+        result = run_process([python, '-c', f"import {imports}"], env=env, cwd=PYTHON_DIR, timeout=timeout)
+        result['ok'] = result['returncode'] == 0
+        result['error'] = None if result['ok'] else f"Exited with code {result['returncode']}"
+        return result
+
+    return run
+
+
+def clustering_runner(payload, python, timeout):
+    """Return a callable that runs clustering.py once on the given payload"""
+    stdin_data = json.dumps(payload)
+
+    def run(env):
+        result = run_process([python, CLUSTERING_SCRIPT], stdin_data, env=env, cwd=PYTHON_DIR, timeout=timeout)
+        result['ok'] = result['returncode'] == 0
+        if result['ok']:
+            try:
+                parsed = json.loads(result['output'].strip())
+                result['ok'] = not parsed.get('error')
+                result['error'] = parsed.get('error')
+            except ValueError:
+                result['ok'] = False
+                result['error'] = 'Unparseable clustering output'
+        else:
+            result['error'] = f"Exited with code {result['returncode']}"
+        return result
+
+    return run
+
+
+def weather_runner(python, timeout):
+    """Return a callable that runs weatherForecast.py for the next city in rotation"""
+    counter = {'next': 0}
+    lock = threading.Lock()
+
+    def run(env):
+        with lock:
+            city = WEATHER_CITIES[counter['next'] % len(WEATHER_CITIES)]
+            counter['next'] += 1
+        # weatherForecast.py writes its CSVs to the working directory
+        workdir = tempfile.mkdtemp(prefix='weather-bench-')
+        try:
+            result = run_process([python, WEATHER_SCRIPT, city], env=env, cwd=workdir, timeout=timeout)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        result['ok'] = result['returncode'] == 0
+        result['error'] = None if result['ok'] else f"Exited with code {result['returncode']}"
+        return result
+
+    return run
+
+
+def summarize(results, wall_time=None):
+    """Aggregate latency, throughput and memory statistics for a batch of runs"""
+    latencies = [r['latency'] for r in results if r['ok']]
+    rss = [r['rss_mb'] for r in results if r['rss_mb'] is not None]
+    errors = [r['error'] for r in results if not r['ok']]
+
+    summary = {
+        'runs': len(results),
+        'errors': len(errors),
+        'latency_p50_s': percentile(latencies, 50),
+        'latency_p95_s': percentile(latencies, 95),
+        'latency_p99_s': percentile(latencies, 99),
+        'latency_mean_s': sum(latencies) / len(latencies) if latencies else None,
+        'latency_max_s': max(latencies) if latencies else None,
+        'peak_rss_mb': max(rss) if rss else None,
+        'mean_peak_rss_mb': sum(rss) / len(rss) if rss else None
+    }
+    if wall_time is not None:
+        summary['wall_time_s'] = wall_time
+        summary['throughput_rps'] = len(latencies) / wall_time if wall_time > 0 else None
+    if errors:
+        summary['first_error'] = errors[0]
+
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+def benchmark_startup(run, env, runs):
+    """Time the first interpreter start for a script, then the steady-state start cost"""
+    cold = summarize([run(env)])
+    started = time.perf_counter()
+    warm = summarize([run(env) for _ in range(runs)], time.perf_counter() - started)
+
+    summary = {'cold': cold, 'warm': {'1': warm}}
+    if cold['latency_p50_s'] is not None and warm['latency_p50_s'] is not None:
+        summary['cold_start_penalty_s'] = round(cold['latency_p50_s'] - warm['latency_p50_s'], 4)
+    return summary
+
+
+def benchmark_scenario(run, env, concurrency_levels, requests):
+    """Measure throughput and latency at each concurrency level after one warm-up run"""
+    run(env)  # Warm the OS page cache for this workload, not measured
+
+    by_concurrency = {}
+    for concurrency in concurrency_levels:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda _: run(env), range(requests)))
+        by_concurrency[str(concurrency)] = summarize(results, time.perf_counter() - started)
+    return {'warm': by_concurrency}
+
+
+def print_summary(name, summary):
+    print(f"\n{name}")
+    if 'cold' in summary:
+        cold = summary['cold']
+        print(f"  cold      p50 {fmt(cold['latency_p50_s'])}s  rss {fmt(cold['peak_rss_mb'])}MB  errors {cold['errors']}")
+    for concurrency, warm in summary['warm'].items():
+        print(
+            f"  warm x{concurrency:<3} {fmt(warm['throughput_rps'])} req/s  "
+            f"p50 {fmt(warm['latency_p50_s'])}s  p95 {fmt(warm['latency_p95_s'])}s  "
+            f"p99 {fmt(warm['latency_p99_s'])}s  rss {fmt(warm['peak_rss_mb'])}MB  errors {warm['errors']}"
+        )
+        if warm.get('first_error'):
+            print(f"            first error: {warm['first_error']}")
+
+
+def fmt(value):
+    return '-' if value is None else f"{value:.3f}"
+
+
+def error_rate(summary):
+    return summary['errors'] / summary['runs'] if summary.get('runs') else 0.0
+
+
+def failed_scenarios(report):
+    """Names of scenarios in which any run failed"""
+    failed = []
+    for name, summary in report['results'].items():
+        batches = list(summary['warm'].values()) + [summary.get('cold')]
+        if any(batch and batch['errors'] for batch in batches):
+            failed.append(name)
+    return failed
+
+
+# Function to flag scenarios that failed more, got slower, lost throughput or grew in memory
+def compare_to_baseline(current, baseline, tolerance):
+    regressions = []
+    for name, summary in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+
+        pairs = [(f"warm x{c}", warm, previous.get('warm', {}).get(c)) for c, warm in summary['warm'].items()]
+        pairs.append(('cold', summary.get('cold'), previous.get('cold')))
+
+        for label, now, before in pairs:
+            if now is None or before is None:
+                continue
+
+            if now['errors'] > before['errors'] or error_rate(now) > error_rate(before):
+                regressions.append(
+                    f"{name} {label} errors: {before['errors']}/{before['runs']} -> {now['errors']}/{now['runs']}"
+                )
+
+            for metric, higher_is_worse in [('latency_p95_s', True), ('peak_rss_mb', True), ('throughput_rps', False)]:
+                new_value, old_value = now.get(metric), before.get(metric)
+                if old_value is None:
+                    continue
+                if new_value is None:
+                    # Every run failed, so there is nothing left to measure
+                    regressions.append(f"{name} {label} {metric}: {old_value} -> missing")
+                    continue
+                if old_value == 0:
+                    change = 0.0 if new_value == 0 else math.inf
+                else:
+                    change = (new_value - old_value) / old_value
+                if (change > tolerance) if higher_is_worse else (change < -tolerance):
+                    regressions.append(f"{name} {label} {metric}: {old_value} -> {new_value} ({change:+.1%})")
+    return regressions
+
+
+def parse_list(value, cast=str):
+    return [cast(item.strip()) for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark clustering.py and weatherForecast.py offline')
+    parser.add_argument('--suite', choices=['clustering', 'weather', 'all'], default='all')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in SIZES), help='Landmark counts to generate')
+    parser.add_argument('--densities', default=','.join(DENSITIES), help=f"Any of: {', '.join(DENSITIES)}")
+    parser.add_argument('--days', type=int, default=3, help='Number of clusters (trip days) requested')
+    parser.add_argument('--concurrency', default='1,4', help='Comma-separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=20, help='Warm clustering runs per concurrency level')
+    parser.add_argument('--weather-requests', type=int, default=4, help='Warm forecast runs per concurrency level')
+    parser.add_argument('--startup-runs', type=int, default=5, help='Warm import-only runs per script')
+    parser.add_argument('--api-latency-ms', type=float, default=0, help='Latency added by the mock weather API')
+    parser.add_argument('--timeout', type=float, default=300, help='Seconds before a single run is killed')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter used to run the scripts')
+    parser.add_argument('--output', help='Where to write the JSON results (default: baseline.json, '
+                                         'or results-<timestamp>.json when comparing)')
+    parser.add_argument('--compare', help='Baseline JSON to compare against; exits 1 on regression')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Allow the results to overwrite the --compare baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed relative change before flagging')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    concurrency_levels = parse_list(args.concurrency, int)
+    densities = parse_list(args.densities)
+    unknown = [density for density in densities if density not in DENSITIES]
+    if unknown:
+        print(f"ERROR: Unknown densities: {', '.join(unknown)}", file=sys.stderr)
+        sys.exit(2)
+
+    created = datetime.now()
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+        if args.update_baseline:
+            args.output = args.output or args.compare
+        elif args.output is None:
+            args.output = os.path.join(BENCHMARK_DIR, f"results-{created.strftime('%Y%m%d-%H%M%S')}.json")
+        elif os.path.abspath(args.output) == os.path.abspath(args.compare):
+            print("ERROR: --output would overwrite the --compare baseline; pass --update-baseline to replace it",
+                  file=sys.stderr)
+            sys.exit(2)
+    elif args.output is None:
+        args.output = DEFAULT_BASELINE
+
+    report = {
+        'created': created.isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare', 'update_baseline')},
+        'results': {}
+    }
+
+    base_env = dict(os.environ, PYTHONIOENCODING='utf-8')
+
+    if args.suite in ('clustering', 'all'):
+        run = startup_runner(CLUSTERING_IMPORTS, args.python, args.timeout)
+        summary = benchmark_startup(run, base_env, args.startup_runs)
+        report['results']['clustering/startup'] = summary
+        print_summary('clustering/startup', summary)
+
+        for name, payload in landmark_scenarios(parse_list(args.sizes, int), densities, args.days):
+            run = clustering_runner(payload, args.python, args.timeout)
+            summary = benchmark_scenario(run, base_env, concurrency_levels, args.requests)
+            report['results'][f"clustering/{name}"] = summary
+            print_summary(f"clustering/{name}", summary)
+
+    if args.suite in ('weather', 'all'):
+        run = startup_runner(WEATHER_IMPORTS, args.python, args.timeout)
+        summary = benchmark_startup(run, base_env, args.startup_runs)
+        report['results']['weather/startup'] = summary
+        print_summary('weather/startup', summary)
+
+        with MockWeatherApi(latency_ms=args.api_latency_ms) as api:
+            run = weather_runner(args.python, args.timeout)
+            weather_env = dict(base_env, **api.environment())
+            summary = benchmark_scenario(run, weather_env, concurrency_levels, args.weather_requests)
+            report['results']['weather/forecast'] = summary
+            print_summary('weather/forecast', summary)
+
+    failed = failed_scenarios(report)
+    if failed:
+        # A run with failures must never become the reference for later comparisons
+        print(f"\nERROR: Runs failed in {len(failed)} scenario(s), results not saved:")
+        for name in failed:
+            print(f"  {name}")
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    regressions = []
+    if baseline is not None:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\nREGRESSIONS vs {args.compare} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+        else:
+            print(f"\nNo regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
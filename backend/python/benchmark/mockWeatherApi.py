@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Open-Meteo geocoding and ERA5 archive APIs
+Serves deterministic synthetic data so weatherForecast.py can be benchmarked offline
+"""
+
+import hashlib
+import json
+import math
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+GEOCODING_PATH = '/v1/search'
+ARCHIVE_PATH = '/v1/era5'
+
+
+def city_seed(name):
+    """Stable integer seed for a city name"""
+    return int(hashlib.sha256(name.strip().lower().encode('utf-8')).hexdigest()[:8], 16)
+
+
+def geocode(name):
+    """Deterministic coordinates inside India for any city name"""
+    rng = random.Random(city_seed(name))
+    return {
+        'results': [{
+            'name': name,
+            'latitude': round(rng.uniform(8.0, 32.0), 4),
+            'longitude': round(rng.uniform(68.0, 92.0), 4)
+        }]
+    }
+
+
+def daily_archive(latitude, longitude, start_date, end_date):
+    """Synthetic daily weather with yearly seasonality and noise"""
+    rng = random.Random(f"{latitude:.4f},{longitude:.4f}")
+    start = date.fromisoformat(start_date)
+    end = date.fromisoformat(end_date)
+    base_temp = 34.0 - abs(latitude - 8.0) * 0.4
+
+    daily = {
+        'time': [],
+        'temperature_2m_max': [],
+        'temperature_2m_min': [],
+        'precipitation_sum': [],
+        'relative_humidity_2m_mean': [],
+        'wind_speed_10m_max': []
+    }
+
+    day = start
+    while day <= end:
+        season = math.sin(2 * math.pi * (day.timetuple().tm_yday - 80) / 365.25)
+        monsoon = max(0.0, math.sin(2 * math.pi * (day.timetuple().tm_yday - 150) / 365.25))
+        temp_max = base_temp + 6 * season + rng.gauss(0, 1.5)
+
+        daily['time'].append(day.isoformat())
+        daily['temperature_2m_max'].append(round(temp_max, 1))
+        daily['temperature_2m_min'].append(round(temp_max - 8 - rng.uniform(0, 3), 1))
+        daily['precipitation_sum'].append(round(max(0.0, rng.gauss(12 * monsoon, 4)), 1))
+        daily['relative_humidity_2m_mean'].append(round(min(100, max(10, 55 + 30 * monsoon + rng.gauss(0, 5))), 1))
+        daily['wind_speed_10m_max'].append(round(max(0.0, 12 + 4 * season + rng.gauss(0, 3)), 1))
+        day += timedelta(days=1)
+
+    return {'latitude': latitude, 'longitude': longitude, 'daily': daily}
+
+
+class MockWeatherHandler(BaseHTTPRequestHandler):
+    latency = 0.0  # Seconds added to every response to mimic the real API
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        try:
+            if url.path == GEOCODING_PATH:
+                body = geocode(params.get('name', ''))
+            elif url.path == ARCHIVE_PATH:
+                body = daily_archive(
+                    float(params['latitude']),
+                    float(params['longitude']),
+                    params['start_date'],
+                    params['end_date']
+                )
+            else:
+                self.send_error(404)
+                return
+        except (KeyError, ValueError) as e:
+            self.send_error(400, str(e))
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+class MockWeatherApi:
+    """Run the stand-in API on a background thread"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0):
+        handler = type('Handler', (MockWeatherHandler,), {'latency': latency_ms / 1000})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self):
+        """Environment variables that point weatherForecast.py at this server"""
+        return {
+            'OPEN_METEO_GEOCODING_URL': self.base_url + GEOCODING_PATH,
+            'OPEN_METEO_ARCHIVE_URL': self.base_url + ARCHIVE_PATH
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    with MockWeatherApi(port=port) as api:
+        print(f"Mock Open-Meteo API listening on {api.base_url}")
+        for key, value in api.environment().items():
+            print(f"  {key}={value}")
+        try:
+            api.thread.join()
+        except KeyboardInterrupt:
+            pass
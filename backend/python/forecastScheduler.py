@@ -0,0 +1,442 @@
+#!/usr/bin/env python3
+"""
+Background pre-forecasting scheduler for weather predictions
+Tracks per-city demand and refreshes forecasts ahead of requests during quiet periods
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import time
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module
+    resource = None
+
+PYTHON_DIR = os.path.dirname(os.path.abspath(__file__))
+FORECAST_SCRIPT = os.path.join(PYTHON_DIR, 'weatherForecast.py')
+REQUEST_LOG = os.path.join(PYTHON_DIR, 'forecast_requests.log')
+PROCESSING_LOG = REQUEST_LOG + '.processing'
+METRICS_FILE = os.path.join(PYTHON_DIR, 'forecast_scheduler_metrics.json')
+
+# Locks older than this were left behind by a crashed run (matches weatherController)
+LOCK_STALE_SECONDS = 300
+
+
+def forecast_path(city):
+    """Path of the future forecast CSV written by weatherForecast.py"""
+    return os.path.join(PYTHON_DIR, f"{city}_future_weather.csv")
+
+
+def forecast_age(city, now=None):
+    """Seconds since the city's forecast was last written, or infinity if missing"""
+    now = time.time() if now is None else now
+    try:
+        return max(0.0, now - os.path.getmtime(forecast_path(city)))
+    except OSError:
+        return math.inf
+
+
+def lock_path(city):
+    """In-progress marker shared with weatherController to avoid duplicate runs"""
+    return os.path.join(PYTHON_DIR, f"{city}_forecast.lock")
+
+
+def acquire_lock(city):
+    """Create the city's lock exclusively; False if a live run already holds it"""
+    path = lock_path(city)
+    for _ in range(2):
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) < LOCK_STALE_SECONDS:
+                    return False
+                os.remove(path)
+            except OSError:
+                pass  # Lock disappeared in the meantime, try again
+    return False
+
+
+def release_lock(city):
+    try:
+        os.remove(lock_path(city))
+    except OSError:
+        pass
+
+
+def children_cpu_seconds():
+    """Total user + system CPU time consumed by reaped child processes"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class ForecastScheduler:
+    """Demand-driven scheduler that keeps popular cities' forecasts fresh"""
+
+    def __init__(self, ttl=24 * 3600, refresh_after=None, half_life=6 * 3600,
+                 min_demand=1.5, cpu_budget=0.5, budget_window=3600,
+                 max_concurrency=1, quiet_window=60, quiet_max_requests=2,
+                 max_load=0.75, refresh_timeout=180, hit_window=3600, demand_epsilon=0.05,
+                 retry_backoff=300, max_retry_backoff=6 * 3600, max_failures=5):
+        # Refresh well before the controller starts treating a forecast as stale
+        refresh_after = 0.75 * ttl if refresh_after is None else refresh_after
+        if refresh_after >= ttl:
+            raise ValueError(f"refresh_after ({refresh_after}s) must be shorter than ttl ({ttl}s)")
+
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.half_life = half_life
+        self.min_demand = min_demand
+        self.cpu_budget = cpu_budget  # CPU cores worth of time allowed over budget_window
+        self.budget_window = budget_window
+        self.max_concurrency = max_concurrency
+        self.quiet_window = quiet_window
+        self.quiet_max_requests = quiet_max_requests
+        self.max_load = max_load
+        self.refresh_timeout = refresh_timeout
+        self.hit_window = hit_window
+        self.demand_epsilon = demand_epsilon  # Cities below this decayed demand are forgotten
+        self.retry_backoff = retry_backoff  # Doubled after every consecutive failure
+        self.max_retry_backoff = max_retry_backoff
+        self.max_failures = max_failures  # Consecutive failures before a city's demand is dropped
+
+        self.demand = {}  # city -> (decayed request count, timestamp of last update)
+        self.total_requests = {}
+        self.first_requested = {}  # city -> timestamp of its earliest recorded request
+        self.recent_requests = deque()
+        self.queue = []
+        self.running = {}  # city -> (process, start time, time the forecast became due)
+        self.cpu_usage = deque()  # (finish time, cpu seconds) per completed refresh
+        self.refresh_lags = deque(maxlen=100)
+        self.served = deque()  # (timestamp, hit) for requests inside hit_window
+        self.failures = {}  # city -> (consecutive failed refreshes, next retry timestamp)
+        self.cpu_reaped = children_cpu_seconds() or 0.0
+
+        self.refreshes_completed = 0
+        self.refreshes_failed = 0
+        self.interval = 15  # Seconds between passes, published so readers can spot a dead scheduler
+
+    # Function to record a single forecast request for a city
+    def record_request(self, city, timestamp=None, hit=None):
+        city = city.strip()
+        if not city:
+            return
+        timestamp = time.time() if timestamp is None else timestamp
+
+        count, updated = self.demand.get(city, (0.0, timestamp))
+        self.demand[city] = (self._decay(count, timestamp - updated) + 1.0, timestamp)
+        self.total_requests[city] = self.total_requests.get(city, 0) + 1
+        self.first_requested[city] = min(timestamp, self.first_requested.get(city, timestamp))
+        self.recent_requests.append(timestamp)
+
+        if hit is not None:
+            self.served.append((timestamp, bool(hit)))
+
+    def _decay(self, count, elapsed):
+        if elapsed <= 0:
+            return count
+        return count * 0.5 ** (elapsed / self.half_life)
+
+    def demand_for(self, city, now=None):
+        now = time.time() if now is None else now
+        count, updated = self.demand.get(city, (0.0, now))
+        return self._decay(count, now - updated)
+
+    # Function to pick up requests appended to the log by weatherController
+    def ingest_request_log(self, path=REQUEST_LOG, processing_path=PROCESSING_LOG):
+        # Rotate the log before reading it; the controller reopens the path on every
+        # append, so new requests land in a fresh file and nothing accumulates
+        if not os.path.exists(processing_path):
+            try:
+                os.replace(path, processing_path)
+            except OSError:
+                return 0
+
+        ingested = 0
+        with open(processing_path, 'r', encoding='utf-8') as log:
+            for line in log:
+                try:
+                    entry = json.loads(line)
+                    self.record_request(entry['city'], entry.get('ts'), entry.get('hit'))
+                    ingested += 1
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+        os.remove(processing_path)
+        return ingested
+
+    def prune(self, now=None):
+        """Forget cities nobody asks for any more and requests outside the hit window"""
+        now = time.time() if now is None else now
+        for city in list(self.demand):
+            if city not in self.running and self.demand_for(city, now) < self.demand_epsilon:
+                del self.demand[city]
+                self.total_requests.pop(city, None)
+                self.first_requested.pop(city, None)
+        for city, (_, retry_at) in list(self.failures.items()):
+            if city not in self.demand and retry_at <= now:
+                del self.failures[city]
+        cutoff = now - self.hit_window
+        self.served = deque(entry for entry in self.served if entry[0] >= cutoff)
+
+    # Function to rank cities by demand and forecast staleness
+    def rebuild_queue(self, now=None):
+        now = time.time() if now is None else now
+        queue = []
+        for city in self.demand:
+            if city in self.running or os.path.exists(lock_path(city)):
+                continue
+            if city in self.failures and now < self.failures[city][1]:
+                continue  # Backing off after a failed refresh
+            demand = self.demand_for(city, now)
+            if demand < self.min_demand:
+                continue
+            age = forecast_age(city, now)
+            if age < self.refresh_after:
+                continue
+            staleness = 2.0 if math.isinf(age) else 1.0 + age / self.ttl
+            heapq.heappush(queue, (-demand * staleness, city, age))
+        self.queue = queue
+        return len(queue)
+
+    def is_quiet(self, now=None):
+        now = time.time() if now is None else now
+        while self.recent_requests and self.recent_requests[0] < now - self.quiet_window:
+            self.recent_requests.popleft()
+        if len(self.recent_requests) > self.quiet_max_requests:
+            return False
+        try:
+            load = os.getloadavg()[0] / (os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return True
+        return load <= self.max_load
+
+    def cpu_used(self, now=None):
+        now = time.time() if now is None else now
+        while self.cpu_usage and self.cpu_usage[0][0] < now - self.budget_window:
+            self.cpu_usage.popleft()
+        return sum(seconds for _, seconds in self.cpu_usage)
+
+    def within_budget(self, now=None):
+        return self.cpu_used(now) < self.cpu_budget * self.budget_window
+
+    def start_refresh(self, city, age, now=None):
+        now = time.time() if now is None else now
+        if not acquire_lock(city):
+            return False  # The controller is already forecasting this city
+        try:
+            process = subprocess.Popen(
+                [sys.executable, FORECAST_SCRIPT, city],
+                cwd=PYTHON_DIR,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError:
+            release_lock(city)
+            raise
+        # A missing forecast has been due since the city was first asked for
+        if math.isinf(age):
+            due_at = self.first_requested.get(city, now)
+        else:
+            due_at = now - age + self.refresh_after
+        self.running[city] = (process, now, due_at)
+        return True
+
+    # Function to reap finished refreshes and charge their CPU time to the budget
+    def poll_running(self, now=None):
+        now = time.time() if now is None else now
+        for city, (process, started, due_at) in list(self.running.items()):
+            if process.poll() is None and now - started > self.refresh_timeout:
+                process.kill()
+            if process.poll() is None:
+                continue
+
+            process.wait()
+            del self.running[city]
+            release_lock(city)
+
+            cpu_total = children_cpu_seconds()
+            if cpu_total is None:
+                cpu_seconds = now - started  # Assume one busy core without rusage
+            else:
+                cpu_seconds = max(0.0, cpu_total - self.cpu_reaped)
+                self.cpu_reaped = cpu_total
+            self.cpu_usage.append((now, cpu_seconds))
+
+            if process.returncode == 0:
+                self.refreshes_completed += 1
+                self.failures.pop(city, None)
+                # Lag runs from when the forecast became due until a fresh one exists
+                self.refresh_lags.append(max(0.0, now - due_at))
+            else:
+                self.refreshes_failed += 1
+                self.record_failure(city, now)
+
+    # Function to back off exponentially from cities whose forecast keeps failing
+    def record_failure(self, city, now=None):
+        now = time.time() if now is None else now
+        count = self.failures.get(city, (0, now))[0] + 1
+        delay = min(self.retry_backoff * 2 ** (count - 1), self.max_retry_backoff)
+        self.failures[city] = (count, now + delay)
+
+        if count >= self.max_failures:
+            # Unknown city names or a persistently failing upstream; wait for fresh demand
+            self.demand.pop(city, None)
+            self.total_requests.pop(city, None)
+            self.first_requested.pop(city, None)
+
+    def tick(self, now=None):
+        now = time.time() if now is None else now
+        self.ingest_request_log()
+        self.prune(now)
+        self.poll_running(now)
+        self.rebuild_queue(now)
+
+        while (self.queue and len(self.running) < self.max_concurrency
+               and self.is_quiet(now) and self.within_budget(now)):
+            _, city, age = heapq.heappop(self.queue)
+            self.start_refresh(city, age, now)
+
+    def metrics(self, now=None):
+        now = time.time() if now is None else now
+        hits = sum(1 for _, hit in self.served if hit)
+        misses = len(self.served) - hits
+        lags = list(self.refresh_lags)
+        stale_ages = [age for _, _, age in self.queue if not math.isinf(age)]
+        return {
+            'timestamp': now,
+            'interval_seconds': self.interval,
+            'queue_depth': len(self.queue),
+            'running': sorted(self.running),
+            'tracked_cities': len(self.demand),
+            'hit_window_seconds': self.hit_window,
+            'hits': hits,
+            'misses': misses,
+            'hit_ratio': round(hits / len(self.served), 4) if self.served else None,
+            'refresh_lag_avg_seconds': round(sum(lags) / len(lags), 1) if lags else 0.0,
+            'refresh_lag_max_seconds': round(max(lags), 1) if lags else 0.0,
+            'oldest_queued_forecast_seconds': round(max(stale_ages), 1) if stale_ages else 0.0,
+            'refreshes_completed': self.refreshes_completed,
+            'refreshes_failed': self.refreshes_failed,
+            'failing_cities': {
+                city: {'consecutive_failures': count, 'retry_in_seconds': round(max(0.0, retry_at - now), 1)}
+                for city, (count, retry_at) in self.failures.items()
+            },
+            'cpu_seconds_in_window': round(self.cpu_used(now), 1),
+            'cpu_budget_seconds': self.cpu_budget * self.budget_window,
+            'top_cities': sorted(
+                ({'city': city, 'demand': round(self.demand_for(city, now), 2),
+                  'requests': self.total_requests.get(city, 0)} for city in self.demand),
+                key=lambda entry: entry['demand'], reverse=True
+            )[:10]
+        }
+
+    def write_metrics(self, path=METRICS_FILE):
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as metrics_file:
+            json.dump(self.metrics(), metrics_file, indent=2)
+        os.replace(temp_path, path)
+
+    def run(self, interval=15, parent_pid=None):
+        self.interval = interval
+        while True:
+            if parent_pid is not None and os.getppid() != parent_pid:
+                return  # The server that started us is gone
+            self.tick()
+            self.write_metrics()
+            time.sleep(interval)
+
+    def shutdown(self, grace=10):
+        """Stop in-flight refreshes and release their locks"""
+        for process, _, _ in self.running.values():
+            process.terminate()
+        deadline = time.time() + grace
+        for city, (process, _, _) in list(self.running.items()):
+            try:
+                process.wait(timeout=max(0.0, deadline - time.time()))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+            release_lock(city)
+        self.running.clear()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Refresh popular city weather forecasts ahead of demand')
+    parser.add_argument('--interval', type=float, default=15, help='Seconds between scheduling passes')
+    parser.add_argument('--ttl-hours', type=float, default=24, help='Age after which a forecast is served as stale')
+    parser.add_argument('--refresh-after-hours', type=float, help='Age after which a forecast is refreshed '
+                                                                 '(default: 0.75 x ttl, must be below ttl)')
+    parser.add_argument('--half-life-hours', type=float, default=6, help='Decay half-life of per-city demand')
+    parser.add_argument('--min-demand', type=float, default=1.5, help='Minimum decayed demand to pre-forecast a city')
+    parser.add_argument('--cpu-budget', type=float, default=0.5, help='CPU cores worth of time usable for refreshes')
+    parser.add_argument('--budget-window', type=float, default=3600, help='Seconds over which the CPU budget applies')
+    parser.add_argument('--concurrency', type=int, default=1, help='Maximum simultaneous refreshes')
+    parser.add_argument('--quiet-window', type=float, default=60, help='Seconds of request history used to detect quiet periods')
+    parser.add_argument('--quiet-max-requests', type=int, default=2, help='Requests allowed in the quiet window')
+    parser.add_argument('--max-load', type=float, default=0.75, help='Per-core load average above which refreshes pause')
+    parser.add_argument('--hit-window', type=float, default=3600, help='Seconds of requests used for the hit ratio')
+    parser.add_argument('--retry-backoff', type=float, default=300, help='Seconds to wait after a first failed refresh')
+    parser.add_argument('--max-failures', type=int, default=5, help='Consecutive failures before a city is dropped')
+    parser.add_argument('--exit-with-parent', action='store_true', help='Stop when the launching process exits')
+    parser.add_argument('--once', action='store_true', help='Run a single scheduling pass and print metrics')
+    return parser.parse_args(argv)
+
+
+def build_scheduler(args):
+    refresh_after = None if args.refresh_after_hours is None else args.refresh_after_hours * 3600
+    return ForecastScheduler(
+        ttl=args.ttl_hours * 3600,
+        refresh_after=refresh_after,
+        half_life=args.half_life_hours * 3600,
+        min_demand=args.min_demand,
+        cpu_budget=args.cpu_budget,
+        budget_window=args.budget_window,
+        max_concurrency=args.concurrency,
+        quiet_window=args.quiet_window,
+        quiet_max_requests=args.quiet_max_requests,
+        max_load=args.max_load,
+        hit_window=args.hit_window,
+        retry_backoff=args.retry_backoff,
+        max_failures=args.max_failures
+    )
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        scheduler = build_scheduler(args)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    if args.once:
+        scheduler.tick()
+        scheduler.write_metrics()
+        print(json.dumps(scheduler.metrics(), indent=2))
+        return
+
+    # Turn SIGTERM into a normal exit so running refreshes are cleaned up below
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    print(f"Forecast scheduler started (interval {args.interval}s)", file=sys.stderr)
+    try:
+        scheduler.run(args.interval, os.getppid() if args.exit_with_parent else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,10 @@ warnings.filterwarnings('ignore')
 logging.getLogger('prophet').setLevel(logging.ERROR)
 logging.getLogger('cmdstanpy').setLevel(logging.ERROR)
 
+# Open-Meteo endpoints (overridable so benchmarks can point at a local stand-in)
+GEOCODING_API_URL = os.environ.get('OPEN_METEO_GEOCODING_URL', 'https://geocoding-api.open-meteo.com/v1/search')
+ARCHIVE_API_URL = os.environ.get('OPEN_METEO_ARCHIVE_URL', 'https://archive-api.open-meteo.com/v1/era5')
+
 # Function to safe print (avoid Unicode errors)
 def safe_print(message):
     try:
@@ -25,10 +29,16 @@ def safe_print(message):
         ascii_message = message.encode('ascii', 'ignore').decode('ascii')
         print(ascii_message)
 
+# Function to write a CSV atomically so readers never see a half-written file
+def save_csv_atomic(df, path):
+    temp_path = f"{path}.tmp"
+    df.to_csv(temp_path, index=False)
+    os.replace(temp_path, path)
+
 # Function to get latitude and longitude from a city name
 def get_lat_lon(city_name):
     try:
-        geocode_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city_name}&count=1"
+        geocode_url = f"{GEOCODING_API_URL}?name={city_name}&count=1"
         response = requests.get(geocode_url, timeout=10).json()
 
         if "results" in response and len(response["results"]) > 0:
@@ -54,7 +64,7 @@ def get_historical_weather(city_name, years=5):  # Reduced from 10 to 5 years fo
         end_date = datetime.today().strftime("%Y-%m-%d")
 
         # API URL for past weather data
-        url = f"https://archive-api.open-meteo.com/v1/era5?latitude={lat}&longitude={lon}&start_date={start_date}&end_date={end_date}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,relative_humidity_2m_mean,wind_speed_10m_max&timezone=Asia/Kolkata"
+        url = f"{ARCHIVE_API_URL}?latitude={lat}&longitude={lon}&start_date={start_date}&end_date={end_date}&daily=temperature_2m_max,temperature_2m_min,precipitation_sum,relative_humidity_2m_mean,wind_speed_10m_max&timezone=Asia/Kolkata"
 
         response = requests.get(url, timeout=30).json()
 
@@ -73,7 +83,7 @@ def get_historical_weather(city_name, years=5):  # Reduced from 10 to 5 years fo
             df_hist = df_hist.dropna()
             
             # Save historical data
-            df_hist.to_csv(f"{city_name}_historical_weather.csv", index=False)
+            save_csv_atomic(df_hist, f"{city_name}_historical_weather.csv")
             safe_print(f"SUCCESS: Historical weather data saved for {city_name}")
             return df_hist
         else:
@@ -159,7 +169,7 @@ def predict_future_weather(city_name):
         final_forecast["ds"] = final_forecast["ds"].dt.strftime("%Y-%m-%d")
 
         # Save future forecast to CSV
-        final_forecast.to_csv(f"{city_name}_future_weather.csv", index=False)
+        save_csv_atomic(final_forecast, f"{city_name}_future_weather.csv")
         safe_print(f"SUCCESS: 3-month weather forecast saved for {city_name}")
         
         # Print summary
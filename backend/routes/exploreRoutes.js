@@ -2,7 +2,7 @@ const express = require('express');
 const router = express.Router();
 const { getLandmarksWithImages } = require('../controllers/exploreController');
 const { generateItinerary } = require('../controllers/itineraryController');
-const { getWeatherPrediction, getWeatherForItinerary } = require('../controllers/weatherController');
+const { getWeatherPrediction, getWeatherForItinerary, getForecastSchedulerMetrics } = require('../controllers/weatherController');
 // Existing route for landmark search
 router.get('/search', getLandmarksWithImages);
 
@@ -14,5 +14,6 @@ router.post('/generate-itinerary', generateItinerary);
 // });
 router.post('/weather-prediction', getWeatherPrediction);
 router.post('/weather-itinerary', getWeatherForItinerary);
+router.get('/weather-scheduler-metrics', getForecastSchedulerMetrics);
 
 module.exports = router;
\ No newline at end of file
@@ -16,6 +16,7 @@ const productRoutes = require('./routes/productRoutes');
 const travelPlanRoutes = require('./routes/travelPlanRoutes');
 const userRoutes = require('./routes/userRoutes');
 const postsRoutes = require('./routes/postsRoutes');
+const { startForecastScheduler } = require('./controllers/weatherController');
 
 dotenv.config();
 
@@ -92,6 +93,11 @@ mongoose
   .then(() => {
     app.listen(PORT, () => {
       console.log(`🚀 Server running on port ${PORT}`);
+
+      // Pre-forecast popular cities in the background when enabled
+      if (process.env.ENABLE_FORECAST_SCHEDULER === 'true') {
+        startForecastScheduler();
+      }
     });
   })
   .catch((error) => {